@@ -0,0 +1,233 @@
+import sys
+import json
+import argparse
+
+# Heavy modules (falconpy, PyPDF2, YAML parsers) are imported inside the
+# subcommands that need them so quick commands start fast.
+
+DEFAULT_REPORT_FILE = "campaign_report.json"
+DEFAULT_PLAN_FILE = "campaign_plan.json"
+DEFAULT_SWEEP_FILE = "sweep_report.json"
+DEFAULT_UPLOAD_DESCRIPTION = "Tokenized Test file for RTR operations"
+
+# ====================
+# Function Definitions
+# ====================
+
+def select_tenants(campaign_file, names):
+    """Load the campaign's tenants, keeping only the named ones when given."""
+    from Multi_Tenant_Campaign import load_tenants
+
+    tenants = load_tenants(campaign_file)
+    if not names:
+        return tenants
+
+    unknown = set(names) - {tenant["name"] for tenant in tenants}
+    if unknown:
+        raise ValueError(f"Unknown tenant(s) in {campaign_file}: {', '.join(sorted(unknown))}")
+
+    return [tenant for tenant in tenants if tenant["name"] in names]
+
+
+def report_path(args, campaign):
+    """Resolve the report file from the command line, then the campaign file."""
+    return args.report or campaign.get("report_file", DEFAULT_REPORT_FILE)
+
+
+def upload_command(args):
+    """Upload the campaign's token file to every selected tenant."""
+    import Upload_File_Crowdstrike
+    from Multi_Tenant_Campaign import load_campaign
+
+    settings = load_campaign(args.campaign).get("upload", {})
+    file_path = args.file or settings.get("file_path")
+    description = settings.get("description", DEFAULT_UPLOAD_DESCRIPTION)
+
+    if not file_path:
+        raise ValueError("No file to upload. Set upload.file_path in the campaign file or pass --file.")
+
+    failed = 0
+    for tenant in select_tenants(args.campaign, args.tenant):
+        print(f"\nUploading {file_path} to tenant {tenant['name']}")
+        try:
+            client_id, client_secret = Upload_File_Crowdstrike.get_crowdstrike_credentials(
+                tenant["vault_name"], tenant["secret_name"]
+            )
+            if not Upload_File_Crowdstrike.check_api_credentials(client_id, client_secret, tenant.get("member_cid")):
+                raise Exception("Invalid CrowdStrike API credentials.")
+            Upload_File_Crowdstrike.upload_file_to_crowdstrike(
+                client_id, client_secret, file_path, description, tenant.get("member_cid")
+            )
+        except Exception as e:
+            print(f"Upload to tenant {tenant['name']} failed: {e}")
+            failed += 1
+
+    return 1 if failed else 0
+
+
+def plan_command(args, tenants, max_workers):
+    """Build and cost the execution plan for a campaign without changing any host."""
+    import Dry_Run_Planner
+
+    resolved, resolution_calls = None, 0
+    if not args.no_resolve:
+        resolved, resolution_calls = Dry_Run_Planner.resolve_hosts(tenants, max_workers)
+
+    session_retries = args.session_retries if args.session_retries is not None else Dry_Run_Planner.default_session_retries
+    call_latency = args.call_latency if args.call_latency is not None else Dry_Run_Planner.default_call_latency
+
+    plan = Dry_Run_Planner.build_plan(tenants, args.command, resolved, session_retries)
+    estimate = Dry_Run_Planner.estimate(plan, max_workers, call_latency)
+
+    output_file = args.plan or DEFAULT_PLAN_FILE
+    with open(output_file, "w") as plan_data:
+        json.dump(
+            {"action": args.command, "estimate": estimate, "resolution_api_calls": resolution_calls, "plan": plan},
+            plan_data,
+            indent=2,
+        )
+
+    Dry_Run_Planner.print_plan(plan, estimate, resolution_calls, session_retries)
+    print(f"\nFull plan written to {output_file}")
+    return 0
+
+
+def campaign_command(args):
+    """Run deploy, verify or cleanup for every selected tenant and write the report."""
+    import Multi_Tenant_Campaign
+
+    campaign = Multi_Tenant_Campaign.load_campaign(args.campaign)
+    tenants = select_tenants(args.campaign, args.tenant)
+    max_workers = args.max_workers or campaign.get("max_workers")
+
+    if args.dry_run:
+        return plan_command(args, tenants, max_workers)
+
+    report = Multi_Tenant_Campaign.run_campaign(tenants, max_workers, args.command)
+
+    output_file = report_path(args, campaign)
+    with open(output_file, "w") as report_data:
+        json.dump(report, report_data, indent=2)
+
+    Multi_Tenant_Campaign.print_report(report)
+    print(f"\nFull report written to {output_file}")
+
+    summary = report["summary"]
+    return 1 if summary["failed"] or summary["tenants_failed"] else 0
+
+
+def sweep_command(args):
+    """Remove stale hosts from every selected tenant's RTR enabled group."""
+    import Orphan_Sweeper
+    from Multi_Tenant_Campaign import load_campaign
+
+    campaign = load_campaign(args.campaign)
+    tenants = select_tenants(args.campaign, args.tenant)
+    max_workers = args.max_workers or campaign.get("max_workers")
+
+    report = Orphan_Sweeper.run_sweep(tenants, max_workers, args.dry_run)
+
+    output_file = args.report or DEFAULT_SWEEP_FILE
+    with open(output_file, "w") as report_data:
+        json.dump(report, report_data, indent=2)
+
+    Orphan_Sweeper.print_sweep_report(report)
+    print(f"\nFull report written to {output_file}")
+
+    return 1 if report["summary"]["tenants_failed"] else 0
+
+
+def status_command(args):
+    """Print the summary of the last campaign report."""
+    from Multi_Tenant_Campaign import load_campaign, print_report
+
+    campaign = load_campaign(args.campaign) if args.campaign else {}
+    input_file = report_path(args, campaign)
+
+    try:
+        with open(input_file, "r") as report_data:
+            report = json.load(report_data)
+    except FileNotFoundError:
+        print(f"No campaign report found at {input_file}")
+        return 1
+
+    if "plan" in report:
+        print(f"{input_file} is a dry-run plan, not a campaign report")
+        return 1
+    if "generated_at" not in report or "summary" not in report:
+        print(f"{input_file} is not a campaign report")
+        return 1
+
+    print(f"Last {report['action']} run: {report['generated_at']}")
+    if report["action"] == "sweep":
+        from Orphan_Sweeper import print_sweep_report
+
+        print_sweep_report(report)
+        return 1 if report["summary"]["tenants_failed"] else 0
+
+    print_report(report)
+
+    summary = report["summary"]
+    return 1 if summary["failed"] or summary["tenants_failed"] else 0
+
+
+def build_parser():
+    """Build the argument parser for all subcommands."""
+    parser = argparse.ArgumentParser(
+        prog="cyber-deception",
+        description="Deploy Canary Tokens through CrowdStrike RTR from a campaign file.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    upload_parser = subparsers.add_parser("upload", help="Upload the token file to each tenant's RTR put files")
+    upload_parser.add_argument("campaign", help="Campaign file (.toml, .yaml, .yml or .json)")
+    upload_parser.add_argument("--tenant", action="append", help="Only this tenant (repeatable)")
+    upload_parser.add_argument("--file", help="File to upload instead of upload.file_path")
+    upload_parser.set_defaults(handler=upload_command)
+
+    campaign_help = {
+        "deploy": "Deploy the token file to every host in the campaign",
+        "verify": "Confirm the token file is still present on every host",
+        "cleanup": "Remove every host from the RTR enabled group and close its sessions",
+    }
+    for command, help_text in campaign_help.items():
+        command_parser = subparsers.add_parser(command, help=help_text)
+        command_parser.add_argument("campaign", help="Campaign file (.toml, .yaml, .yml or .json)")
+        command_parser.add_argument("--tenant", action="append", help="Only this tenant (repeatable)")
+        command_parser.add_argument("--max-workers", type=int, help="Maximum tenants run at once")
+        command_parser.add_argument("--report", help="Where to write the campaign report")
+        command_parser.add_argument("--plan", help="With --dry-run, where to write the plan")
+        command_parser.add_argument("--dry-run", action="store_true", help="Plan and estimate the run without changing any host")
+        command_parser.add_argument("--no-resolve", action="store_true", help="With --dry-run, skip host lookups and make no API calls")
+        command_parser.add_argument("--call-latency", type=float, help="With --dry-run, expected seconds per API call")
+        command_parser.add_argument("--session-retries", type=int, help="With --dry-run, expected init_session retries per host")
+        command_parser.set_defaults(handler=campaign_command)
+
+    sweep_parser = subparsers.add_parser("sweep", help="Remove stale hosts from the RTR enabled group in bulk")
+    sweep_parser.add_argument("campaign", help="Campaign file (.toml, .yaml, .yml or .json)")
+    sweep_parser.add_argument("--tenant", action="append", help="Only this tenant (repeatable)")
+    sweep_parser.add_argument("--max-workers", type=int, help="Maximum tenants swept at once")
+    sweep_parser.add_argument("--report", help="Where to write the sweep report")
+    sweep_parser.add_argument("--dry-run", action="store_true", help="List stale hosts without removing them")
+    sweep_parser.set_defaults(handler=sweep_command)
+
+    status_parser = subparsers.add_parser("status", help="Show the result of the last campaign run")
+    status_parser.add_argument("campaign", nargs="?", help="Campaign file whose report_file to read")
+    status_parser.add_argument("--report", help="Report file to read")
+    status_parser.set_defaults(handler=status_command)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    try:
+        return args.handler(args)
+    except Exception as e:
+        print(f"An error occurred during {args.command}: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,14 +5,21 @@ import json
 import subprocess
 from pathlib import Path
 from urllib.parse import urlparse
-from PyPDF2 import PdfReader
-from falconpy import Hosts, HostGroup, RealTimeResponse, RealTimeResponseAdmin
 
 # ====================
 # Configuration Section
 # ====================
 vault_name = "<insert>"  # 1Password vault name
 secret_name = "<insert>"  # 1Password secret name
+member_cid = None  # Optional: child CID when authenticating through a parent (MSSP) tenant
+rtr_group_id = "<insert>"  # Host group ID of the RTR enabled group
+interactive = True  # Prompt before reusing an existing directory; False continues unattended
+rtr_command_delay = 2  # Seconds to pause between RTR commands
+rtr_retry_delay = 60  # Seconds to wait before retrying a session while RTR is being enabled
+max_session_retries = 10  # Session retries before giving up on a host when running unattended
+max_status_checks = 10  # Status checks before giving up on an RTR command that has not completed
+# Marker files for hosts a run has put in the RTR enabled group; absolute so every run and sweep shares them
+active_deployments_dir = os.path.join(os.path.expanduser("~"), ".cyber_deception", "active_deployments")
 
 # File Location
 # Workstation serial
@@ -33,6 +40,8 @@ mac_file_path = "<insert>"
 
 def check_pdf_for_links(pdf_path):
     """Check if the PDF contains external links and return the first link."""
+    from PyPDF2 import PdfReader  # Imported here so deployments do not pay for it
+
     reader = PdfReader(pdf_path)
     for page in reader.pages:
         if "/Annots" in page:
@@ -63,16 +72,34 @@ def trust_pdf_url(domain):
 # Function Definitions
 # ====================
 
+class DeploymentAborted(Exception):
+    """Raised instead of quitting when a run is stopped while running unattended."""
+
+
+def abort(message):
+    """Stop the run, quitting when interactive and raising DeploymentAborted otherwise."""
+    if interactive:
+        print(message)
+        quit()
+    raise DeploymentAborted(message.strip())
+
+
+def signin_1password():
+    """Sign in to 1Password if no session is active and return the session token."""
+    session_token = os.getenv("OP_SESSION_my")
+    if not session_token:
+        print("1Password session not found. Signing in...")
+        signin_command = ["op", "signin", "--raw"]
+        session_token = subprocess.check_output(signin_command, text=True).strip()
+        os.environ["OP_SESSION_my"] = session_token
+        print()  # Add blank line
+    return session_token
+
+
 def authenticate_1password(vault_name, secret_name):
     """Authenticate into 1Password and retrieve a secret."""
     try:
-        session_token = os.getenv("OP_SESSION_my")
-        if not session_token:
-            print("1Password session not found. Signing in...")
-            signin_command = ["op", "signin", "--raw"]
-            session_token = subprocess.check_output(signin_command, text=True).strip()
-            os.environ["OP_SESSION_my"] = session_token
-            print()  # Add blank line
+        signin_1password()
 
         command = [
             "op", "item", "get", secret_name,
@@ -96,9 +123,11 @@ def authenticate_1password(vault_name, secret_name):
         raise
 
 
-def initialize_apis(client_id, client_secret):
-    """Initialize CrowdStrike API clients."""
-    host_api = Hosts(client_id=client_id, client_secret=client_secret)
+def initialize_apis(client_id, client_secret, member_cid=None):
+    """Initialize CrowdStrike API clients, optionally scoped to a child CID."""
+    from falconpy import Hosts, HostGroup, RealTimeResponse, RealTimeResponseAdmin
+
+    host_api = Hosts(client_id=client_id, client_secret=client_secret, member_cid=member_cid)
     host_group_api = HostGroup(auth_object=host_api)
     rtr_admin_api = RealTimeResponseAdmin(auth_object=host_api)
     rtr_api = RealTimeResponse(auth_object=host_api)
@@ -115,8 +144,8 @@ def get_uploaded_files():
         print(element["name"])
 
 
-def host_info():
-    """Gather host info and return Device ID and Host Operating System."""
+def find_device_id():
+    """Look up the Device ID for the configured serial."""
     host_filter = f"serial_number:*'*{serial}*'"
 
     # Get device ID of a specific serial
@@ -124,11 +153,17 @@ def host_info():
 
     print("Device ID: " + str(device_id))
 
+    return device_id
+
+
+def host_info():
+    """Gather host info and return Device ID and Host Operating System."""
+    device_id = find_device_id()
+
     online_status = host_api.get_online_state(ids=device_id)["body"]["resources"][0]["state"]
 
     if str(online_status) != "online":
-        print("\nHost is offline. Please verify that the serial is correct then try again.")
-        quit()
+        abort(f"\nHost {serial} is offline. Please verify that the serial is correct then try again.")
 
     # Get host operating system
     host_OS = host_api.get_device_details(ids=device_id)["body"]["resources"][0]["platform_name"]
@@ -138,13 +173,38 @@ def host_info():
     return device_id, host_OS
 
 
+def resolve_host():
+    """Look up the host without changing anything and return its details for planning."""
+    device_id = find_device_id()
+
+    online_status = host_api.get_online_state(ids=device_id)["body"]["resources"][0]["state"]
+    host_OS = host_api.get_device_details(ids=device_id)["body"]["resources"][0]["platform_name"]
+
+    return {"device_id": device_id, "platform": host_OS, "online": str(online_status) == "online"}
+
+
+def mark_active(device_id, active=True):
+    """Record, or clear, that this run has put the host in the RTR enabled group."""
+    marker = os.path.join(active_deployments_dir, str(device_id))
+
+    if active:
+        os.makedirs(active_deployments_dir, exist_ok=True)
+        with open(marker, "w") as marker_file:
+            marker_file.write(str(os.getpid()))
+    elif os.path.exists(marker):
+        os.remove(marker)
+
+
 def enable_rtr(device_id):
     """Add host to RTR enabled group."""
     host_filter = f"device_id:'{device_id}'"
 
+    # Mark the host first so a cleanup sweep never removes it mid-deployment
+    mark_active(device_id)
+
     add_hosts = host_group_api.perform_group_action(
         action_name="add-hosts",
-        ids="<insert>",
+        ids=rtr_group_id,
         filter=host_filter,
     )
 
@@ -168,6 +228,8 @@ def start_rtr_connection(device_id):
     session_id = ""
     regex = "[A-Za-z0-9]+-[A-Za-z0-9]+-[A-Za-z0-9]+-[A-Za-z0-9]+-[A-Za-z0-9]+"
 
+    retries = 0
+
     # Attempt to start RTR session, sleeping if RTR is not enabled yet
     while not re.match(regex, session_id):
         try:
@@ -177,8 +239,12 @@ def start_rtr_connection(device_id):
 
             print("Session ID: " + str(session_id))
         except IndexError:
-            print("RTR is not yet enabled, sleeping 60 seconds\n")
-            time.sleep(60)
+            # Interactive runs keep waiting; unattended runs must not block their tenant forever
+            if not interactive and retries >= max_session_retries:
+                abort(f"\nRTR did not become available on {serial} after {retries} retries.")
+            retries += 1
+            print(f"RTR is not yet enabled, sleeping {rtr_retry_delay} seconds\n")
+            time.sleep(rtr_retry_delay)
 
     return session_id
 
@@ -194,7 +260,7 @@ def check_directory(session_id, file_path):
     )["body"]["resources"][0]["cloud_request_id"]
 
     # Sleep to prevent RTR commands from executing too quickly
-    time.sleep(2)
+    time.sleep(rtr_command_delay)
 
     # Check status of cd command
     check_if_directory_exists_response = rtr_admin_api.check_admin_command_status(
@@ -203,6 +269,8 @@ def check_directory(session_id, file_path):
 
     if "Cannot find path" in str(check_if_directory_exists_response):
         print("\nFolder does not exist, creating folder")
+    elif not interactive:
+        print("\nDirectory already exists, continuing")
     else:
         user_response = (
             input(
@@ -214,11 +282,10 @@ def check_directory(session_id, file_path):
         )
 
         if not user_response:
-            print("\nExiting program")
-            quit()
+            abort("\nExiting program")
 
     # Sleep to prevent RTR commands from executing too quickly
-    time.sleep(2)
+    time.sleep(rtr_command_delay)
 
 
 def create_directory(session_id, host_OS, file_path):
@@ -240,7 +307,7 @@ def create_directory(session_id, host_OS, file_path):
             print(f"Directory creation failed for {file_path}. Response: {mkdir_response}")
             raise RuntimeError(f"Failed to create directory: {mkdir_response}")
 
-        time.sleep(2)  # Pause to ensure the directory is created
+        time.sleep(rtr_command_delay)  # Pause to ensure the directory is created
 
         # Reset and apply permissions
         icacls_reset_command = rf'icacls "{file_path}" /reset /T /C'
@@ -281,7 +348,7 @@ def create_directory(session_id, host_OS, file_path):
         raise ValueError("Unsupported operating system.")
 
     print(f"\nEnsured directory {file_path} exists with updated permissions.")
-    time.sleep(2)  # Prevent rapid RTR command execution
+    time.sleep(rtr_command_delay)  # Prevent rapid RTR command execution
 
 
 
@@ -296,7 +363,7 @@ def put_file(session_id, file_path):
     )["body"]["resources"][0]["cloud_request_id"]
 
     # Sleep to prevent RTR commands from executing too quickly
-    time.sleep(2)
+    time.sleep(rtr_command_delay)
 
     # Check status of cd command
     cd_response = rtr_admin_api.check_admin_command_status(
@@ -306,7 +373,7 @@ def put_file(session_id, file_path):
     print("\nChanged directory to " + str(cd_response))
 
     # Sleep to prevent RTR commands from executing too quickly
-    time.sleep(2)
+    time.sleep(rtr_command_delay)
 
     # Execute put command and get request ID
     put_command = rtr_admin_api.execute_admin_command(
@@ -317,7 +384,7 @@ def put_file(session_id, file_path):
     )
 
     # Sleep to prevent RTR commands from executing too quickly
-    time.sleep(2)
+    time.sleep(rtr_command_delay)
 
     # # Check status of put command
     try:
@@ -334,10 +401,10 @@ def put_file(session_id, file_path):
         print("Unable to find that filename.")
         print("Verify that file_to_put is in the below list and try again:\n")
         get_uploaded_files()
-        quit()
+        abort(f"\n{file_to_put} was not found in the uploaded put files.")
 
     # Sleep to prevent RTR commands from executing too quickly
-    time.sleep(2)
+    time.sleep(rtr_command_delay)
 
 
 def rename_file(session_id, host_OS, file_path):
@@ -350,7 +417,7 @@ def rename_file(session_id, host_OS, file_path):
         persist=False,
     )["body"]["resources"][0]["cloud_request_id"]
 
-    time.sleep(2)  # Prevent rapid RTR commands
+    time.sleep(rtr_command_delay)  # Prevent rapid RTR commands
 
     # Check status of mv command
     mv_response = rtr_admin_api.check_admin_command_status(cloud_request_id=mv_file)
@@ -370,7 +437,7 @@ def rename_file(session_id, host_OS, file_path):
         print(f"\nErrors renaming {file_to_put}\n")
         print(mv_response)
 
-    time.sleep(2)  # Prevent rapid RTR commands
+    time.sleep(rtr_command_delay)  # Prevent rapid RTR commands
 
 
 
@@ -427,7 +494,7 @@ def change_permissions(session_id, host_OS, path, is_file=False):
     else:
         raise ValueError("Unsupported operating system.")
 
-    time.sleep(2)  # Prevent rapid RTR command execution
+    time.sleep(rtr_command_delay)  # Prevent rapid RTR command execution
 
 
 def unblock_file(session_id, file_path):
@@ -455,7 +522,7 @@ def unblock_file(session_id, file_path):
         print(unblock_response)
 
     # Sleep to prevent RTR commands from executing too quickly
-    time.sleep(2)
+    time.sleep(rtr_command_delay)
 
 
 
@@ -466,62 +533,132 @@ def remove_from_rtr(device_id):
     # Remove from CD Deployment host group, which disables RTR
     rtr_removal = host_group_api.perform_group_action(
         action_name="remove-hosts",
-        ids="<insert>",
+        ids=rtr_group_id,
         filter=device_filter,
     )
 
     if "200" in str(rtr_removal["status_code"]):
+        mark_active(device_id, active=False)
         print("\n" + str(serial) + " removed from RTR enabled group")
     else:
         print("\n" + str(serial) + " could not be removed from RTR enabled group\n")
         print(rtr_removal)
 
 
-def main():
+# stderr from ls on macOS, cmd dir and PowerShell dir when the file is missing
+FILE_NOT_FOUND_MESSAGES = ("No such file or directory", "File Not Found", "Cannot find path")
+
+
+def verify_file(session_id, host_OS, remote_file_path):
+    """Confirm that a file exists on the remote device."""
+    remote_file_path = os.path.normpath(remote_file_path)
+    file_name = os.path.basename(remote_file_path)
+
+    print(f"\nVerifying file exists on remote device: '{remote_file_path}'...")
+
+    try:
+        validate_file_command = (
+            rtr_admin_api.execute_admin_command(
+                base_command="ls",
+                session_id=session_id,
+                command_string=f"ls \"{remote_file_path}\"",
+                persist=False,
+            ) if host_OS == "Mac" else
+            rtr_admin_api.execute_admin_command(
+                base_command="runscript",
+                session_id=session_id,
+                command_string=f"runscript -Raw='dir \"{remote_file_path}\"'",
+                persist=False,
+            )
+        )
+        cloud_request_id = validate_file_command["body"]["resources"][0]["cloud_request_id"]
+
+        # The queued command only carries its request ID, so poll its status until it completes
+        for _ in range(max_status_checks):
+            # Sleep to prevent RTR commands from executing too quickly
+            time.sleep(rtr_command_delay)
+
+            resources = rtr_admin_api.check_admin_command_status(
+                cloud_request_id=cloud_request_id
+            )["body"].get("resources") or []
+            if resources and resources[0].get("complete", True):
+                break
+        else:
+            raise RuntimeError(f"Listing '{file_name}' did not complete after {max_status_checks} status checks.")
+
+        stderr = str(resources[0].get("stderr", ""))
+        if any(message in stderr for message in FILE_NOT_FOUND_MESSAGES):
+            raise FileNotFoundError(f"File '{file_name}' not found.")
+        print(f"\nFile '{file_name}' confirmed on remote device.")
+    except Exception as e:
+        print(f"\nError verifying file: {e}")
+        raise
+
+
+def close_sessions(device_id):
+    """Delete any RTR sessions still open against the host."""
+    session_ids = rtr_api.list_all_sessions(filter=f"device_id:'{device_id}'")["body"]["resources"] or []
+
+    for session_id in session_ids:
+        rtr_api.delete_session(session_id=session_id)
+        print("\nDeleted RTR session " + str(session_id))
+
+
+def end_rtr_connection(device_id, session_id):
+    """Take the host out of the RTR enabled group and close its session, even after a failed step."""
+    remove_from_rtr(device_id)
+
+    if session_id:
+        rtr_api.delete_session(session_id=session_id)
+
+
+def verify():
+    """Confirm the deployed file is still present without redeploying it."""
     device_id, host_OS = host_info()
 
     file_path = os.path.normpath(win_file_path if host_OS == "Windows" else mac_file_path)
 
     enable_rtr(device_id)
 
-    session_id = start_rtr_connection(device_id)
+    session_id = None
+    try:
+        session_id = start_rtr_connection(device_id)
 
-    check_directory(session_id, file_path)
-    create_directory(session_id, host_OS, file_path)  # Permissions applied to directory here
-    put_file(session_id, file_path)
+        verify_file(session_id, host_OS, os.path.join(file_path, renamed_file or file_to_put))
+    finally:
+        end_rtr_connection(device_id, session_id)
 
-    if renamed_file:
-        rename_file(session_id, host_OS, file_path)  # Permissions applied to renamed file here
 
-        renamed_file_path = os.path.normpath(os.path.join(file_path, renamed_file))
+def cleanup():
+    """Remove the host from the RTR enabled group and close its open sessions."""
+    # Offline hosts are cleaned up too, so skip the online check in host_info()
+    device_id = find_device_id()
 
-        print(f"\nVerifying renamed file exists on remote device: '{renamed_file_path}'...")
+    remove_from_rtr(device_id)
+    close_sessions(device_id)
 
-        try:
-            validate_file_command = (
-                rtr_admin_api.execute_admin_command(
-                    base_command="ls",
-                    session_id=session_id,
-                    command_string=f"ls \"{renamed_file_path}\"",
-                    persist=False,
-                ) if host_OS == "Mac" else
-                rtr_admin_api.execute_admin_command(
-                    base_command="runscript",
-                    session_id=session_id,
-                    command_string=f"runscript -Raw='dir \"{renamed_file_path}\"'",
-                    persist=False,
-                )
-            )
-            resources = validate_file_command["body"].get("resources", [])
-            if not resources or "No such file or directory" in resources[0].get("stderr", ""):
-                raise FileNotFoundError(f"Renamed file '{renamed_file}' not found.")
-            print(f"\nRenamed file '{renamed_file}' confirmed on remote device.")
-        except Exception as e:
-            print(f"\nError verifying renamed file: {e}")
-            raise
 
-    remove_from_rtr(device_id)
-    rtr_api.delete_session(session_id=session_id)
+def main():
+    device_id, host_OS = host_info()
+
+    file_path = os.path.normpath(win_file_path if host_OS == "Windows" else mac_file_path)
+
+    enable_rtr(device_id)
+
+    session_id = None
+    try:
+        session_id = start_rtr_connection(device_id)
+
+        check_directory(session_id, file_path)
+        create_directory(session_id, host_OS, file_path)  # Permissions applied to directory here
+        put_file(session_id, file_path)
+
+        if renamed_file:
+            rename_file(session_id, host_OS, file_path)  # Permissions applied to renamed file here
+
+            verify_file(session_id, host_OS, os.path.join(file_path, renamed_file))
+    finally:
+        end_rtr_connection(device_id, session_id)
 
 
 
@@ -531,7 +668,7 @@ if __name__ == "__main__":
         client_id, client_secret = authenticate_1password(vault_name, secret_name)
 
         # Initialize APIs
-        host_api, host_group_api, rtr_admin_api, rtr_api = initialize_apis(client_id, client_secret)
+        host_api, host_group_api, rtr_admin_api, rtr_api = initialize_apis(client_id, client_secret, member_cid)
 
         # Run the main deployment logic
         main()
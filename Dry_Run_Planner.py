@@ -0,0 +1,211 @@
+import heapq
+
+import Deployment
+import Multi_Tenant_Campaign
+
+# ====================
+# Configuration Section
+# ====================
+
+default_call_latency = 0.5  # Expected seconds per Falcon API call
+default_session_retries = 1  # Expected init_session retries while RTR is being enabled after add-hosts
+default_platform = "Windows"  # Assumed when hosts are not resolved; the Windows path makes the most calls
+
+# ====================
+# Plan Construction
+# ====================
+
+def plan_host(action, host_OS, renamed_file, session_retries=default_session_retries):
+    """
+    Return the ordered steps an action would run against one host.
+
+    Mirrors the call sequence of Deployment.main(), verify() and cleanup(),
+    counting one API call per falconpy request and every fixed sleep.
+    verify_file() is counted as completing on its first status check.
+    """
+    delay = Deployment.rtr_command_delay
+    windows = host_OS == "Windows"
+    steps = []
+
+    def add_step(name, api_calls, wait_seconds=0):
+        steps.append({"step": name, "api_calls": api_calls, "wait_seconds": wait_seconds})
+
+    def start_session():
+        add_step("enable_rtr", 1)
+        add_step("start_rtr_connection", 1 + session_retries, session_retries * Deployment.rtr_retry_delay)
+
+    def finish_session():
+        add_step("remove_from_rtr", 1)
+        add_step("delete_session", 1)
+
+    if action == "deploy":
+        add_step("host_info", 3)
+        start_session()
+        add_step("check_directory", 2, 2 * delay)
+        add_step("create_directory", 3 if windows else 1, (2 if windows else 1) * delay)
+        add_step("put_file", 4, 4 * delay)
+        if renamed_file:
+            # mv and its status check, change_permissions, then unblock_file on Windows
+            add_step("rename_file", 5 if windows else 3, (4 if windows else 3) * delay)
+            add_step("verify_file", 2, delay)
+        finish_session()
+
+    elif action == "verify":
+        add_step("host_info", 3)
+        start_session()
+        add_step("verify_file", 2, delay)
+        finish_session()
+
+    elif action == "cleanup":
+        add_step("find_device_id", 1)
+        add_step("remove_from_rtr", 1)
+        add_step("close_sessions", 1)  # Plus one delete_session per lingering session
+
+    else:
+        raise ValueError(f"Unsupported action for planning: {action}")
+
+    return steps
+
+
+def host_duration(steps, call_latency):
+    """Projected seconds for a list of steps."""
+    return sum(step["wait_seconds"] + step["api_calls"] * call_latency for step in steps)
+
+
+def resolve_hosts(tenants, max_workers=None):
+    """Look up every host's platform and online state with read-only API calls."""
+    report = Multi_Tenant_Campaign.run_campaign(tenants, max_workers, "resolve")
+    resolved = {}
+    for result in report["tenants"]:
+        for outcome in result["deployments"]:
+            resolved[(result["tenant"], outcome["serial"])] = outcome
+    return resolved, report["summary"]["api_calls"]
+
+
+def build_plan(tenants, action="deploy", resolved=None, session_retries=default_session_retries):
+    """
+    Build the execution plan for every deployment without running anything.
+
+    Hosts missing from `resolved` fall back to the deployment's optional
+    `platform` key, then to default_platform.
+    """
+    plan = []
+    for tenant in tenants:
+        hosts = []
+        for deployment in tenant.get("deployments", []):
+            host = {"serial": deployment["serial"], "platform": deployment.get("platform", default_platform)}
+
+            if resolved is not None:
+                lookup = resolved.get((tenant["name"], deployment["serial"]), {})
+                if lookup.get("status") != "success":
+                    host.update(status="unresolved", error=lookup.get("error", "Host was not looked up"), steps=[])
+                    hosts.append(host)
+                    continue
+                host.update(device_id=lookup["device_id"], platform=lookup["platform"], online=lookup["online"])
+
+                # host_info() quits on offline hosts, so deploy and verify stop after the lookup
+                if not lookup["online"] and action != "cleanup":
+                    host.update(status="offline", steps=[{"step": "host_info", "api_calls": 2, "wait_seconds": 0}])
+                    hosts.append(host)
+                    continue
+
+            host.update(
+                status="planned",
+                steps=plan_host(action, host["platform"], deployment.get("renamed_file"), session_retries),
+            )
+            hosts.append(host)
+
+        plan.append({
+            "tenant": tenant["name"],
+            "rate_limit_per_minute": tenant.get("rate_limit_per_minute", Multi_Tenant_Campaign.default_rate_limit),
+            "hosts": hosts,
+        })
+
+    return plan
+
+
+# ====================
+# Cost Estimation
+# ====================
+
+def tenant_cost(tenant_plan, hosts, call_latency):
+    """API calls, duration and rate limit headroom for one tenant running the given hosts."""
+    api_calls = 1 + sum(step["api_calls"] for host in hosts for step in host["steps"])  # 1 for the OAuth2 token
+    seconds = call_latency + sum(host_duration(host["steps"], call_latency) for host in hosts)
+
+    # A tenant can never go faster than its rate limit budget allows
+    budget = tenant_plan["rate_limit_per_minute"]
+    seconds = max(seconds, api_calls / budget * 60)
+    calls_per_minute = api_calls / seconds * 60
+
+    return {
+        "tenant": tenant_plan["tenant"],
+        "hosts": len(hosts),
+        "api_calls": api_calls,
+        "seconds": round(seconds, 1),
+        "calls_per_minute": round(calls_per_minute, 1),
+        "rate_limit_per_minute": budget,
+        "headroom_percent": round(100 * (1 - calls_per_minute / budget), 1),
+    }
+
+
+def makespan(durations, max_workers):
+    """Wall time for tasks handed out in order to the first free of max_workers workers."""
+    workers = [0.0] * max(1, min(max_workers or len(durations), len(durations) or 1))
+    for duration in durations:
+        heapq.heappush(workers, heapq.heappop(workers) + duration)
+    return max(workers)
+
+
+def estimate(plan, max_workers=None, call_latency=default_call_latency):
+    """
+    Estimate API calls, rate limit headroom and duration for a plan.
+
+    Matches run_campaign(): each tenant runs its hosts one after another with
+    a single OAuth2 token, and tenants are handed out in order to
+    `max_workers` parallel workers.
+    """
+    tenants = [tenant_cost(tenant, tenant["hosts"], call_latency) for tenant in plan]
+    hosts = [host for tenant in plan for host in tenant["hosts"]]
+
+    return {
+        "hosts": len(hosts),
+        "hosts_planned": sum(1 for host in hosts if host["status"] == "planned"),
+        "api_calls": sum(tenant["api_calls"] for tenant in tenants),
+        "seconds": round(makespan([tenant["seconds"] for tenant in tenants], max_workers), 1) if tenants else 0.0,
+        "min_headroom_percent": min((tenant["headroom_percent"] for tenant in tenants), default=100.0),
+        "max_workers": max_workers,
+        "call_latency": call_latency,
+        "tenants": tenants,
+    }
+
+
+def print_plan(plan, estimate_summary, resolution_calls=0, session_retries=default_session_retries):
+    """Print the per-host plan and the cost estimate."""
+    print("\nExecution plan:")
+    for tenant in plan:
+        for host in tenant["hosts"]:
+            calls = sum(step["api_calls"] for step in host["steps"])
+            line = f"  {tenant['tenant']} / {host['serial']} ({host['platform']}): {host['status']}, {calls} API calls"
+            if "error" in host:
+                line += f" ({host['error']})"
+            print(line)
+
+    print("\nTenants:")
+    for tenant in estimate_summary["tenants"]:
+        print(
+            f"  {tenant['tenant']}: {tenant['hosts']} hosts, {tenant['api_calls']} API calls, "
+            f"~{tenant['seconds'] / 60:.1f} min, {tenant['headroom_percent']}% rate limit headroom"
+        )
+
+    print(
+        f"\n{estimate_summary['hosts_planned']}/{estimate_summary['hosts']} hosts planned: "
+        f"{estimate_summary['api_calls']} API calls over ~{estimate_summary['seconds'] / 60:.1f} min "
+        f"with {estimate_summary['max_workers'] or 'all'} workers"
+    )
+    print(
+        f"Assumes {session_retries} init_session retries per host ({Deployment.rtr_retry_delay}s each) "
+        f"while RTR is being enabled; change with --session-retries"
+    )
+    if resolution_calls:
+        print(f"Resolving hosts used {resolution_calls} read-only API calls")
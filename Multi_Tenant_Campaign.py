@@ -0,0 +1,282 @@
+import os
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import Deployment
+
+# ====================
+# Configuration Section
+# ====================
+
+"""" *** CHANGE BELOW *** """
+tenants_file = r"<insert>"  # Campaign file (JSON, TOML or YAML) listing tenants and deployments
+report_file = r"campaign_report.json"  # Merged report written after every tenant finishes
+max_workers = None  # Maximum tenants deployed at once; None runs every tenant in parallel
+"""" *** CHANGE ABOVE *** """
+
+default_rate_limit = 600  # API calls per minute allowed for each tenant
+
+# Deployment.py globals a deployment entry may set, with the value used when omitted
+DEPLOYMENT_SETTINGS = {
+    "serial": None,
+    "username": None,
+    "file_to_put": None,
+    "renamed_file": "",
+    "win_file_path": "",
+    "mac_file_path": "",
+}
+# Deployment.py globals set for each tenant, with the value used when omitted. Worker
+# processes are reused across tenants, so every one is reset rather than left as is.
+TENANT_SETTINGS = {
+    "member_cid": None,
+    "rtr_group_id": None,
+    "active_deployments_dir": Deployment.active_deployments_dir,
+}
+REQUIRED_TENANT_KEYS = ("name", "vault_name", "secret_name", "rtr_group_id")
+
+# Deployment.py entry point run for each deployment, by campaign action
+ACTIONS = {
+    "deploy": "main",
+    "verify": "verify",
+    "cleanup": "cleanup",
+    "resolve": "resolve_host",
+}
+
+# ====================
+# Rate Limiting
+# ====================
+
+class RateLimiter:
+    """Sliding one-minute budget of API calls for a single tenant."""
+
+    def __init__(self, calls_per_minute):
+        self.calls_per_minute = calls_per_minute
+        self.recent_calls = deque()
+        self.total_calls = 0
+
+    def wait(self):
+        """Block until another call fits in the budget, then record it."""
+        now = time.monotonic()
+        while self.recent_calls and now - self.recent_calls[0] >= 60:
+            self.recent_calls.popleft()
+
+        if len(self.recent_calls) >= self.calls_per_minute:
+            time.sleep(60 - (now - self.recent_calls[0]))
+            self.recent_calls.popleft()
+
+        self.recent_calls.append(time.monotonic())
+        self.total_calls += 1
+
+
+class RateLimitedService:
+    """Wrap a falconpy service class so every API call draws from a RateLimiter."""
+
+    def __init__(self, service, limiter):
+        self._service = service
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        attribute = getattr(self._service, name)
+        if not callable(attribute):
+            return attribute
+
+        def limited_call(*args, **kwargs):
+            self._limiter.wait()
+            return attribute(*args, **kwargs)
+
+        return limited_call
+
+# ====================
+# Function Definitions
+# ====================
+
+def load_campaign(path):
+    """Load a campaign file, choosing the parser from the file extension."""
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".toml":
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+        with open(path, "rb") as campaign_data:
+            return tomllib.load(campaign_data)
+
+    if extension in (".yaml", ".yml"):
+        import yaml
+        with open(path, "r") as campaign_data:
+            return yaml.safe_load(campaign_data) or {}
+
+    with open(path, "r") as campaign_data:
+        return json.load(campaign_data)
+
+
+def load_tenants(path):
+    """Load and validate the tenant list from a campaign file."""
+    campaign = load_campaign(path)
+    tenants = campaign.get("tenants", [])
+
+    if not tenants:
+        raise ValueError(f"No tenants defined in {path}.")
+
+    names = set()
+    for tenant in tenants:
+        missing = [key for key in REQUIRED_TENANT_KEYS if not tenant.get(key)]
+        if missing:
+            raise ValueError(f"Tenant {tenant.get('name', '<unnamed>')} is missing: {', '.join(missing)}")
+        if tenant["name"] in names:
+            raise ValueError(f"Tenant name {tenant['name']} is defined more than once.")
+        names.add(tenant["name"])
+
+        for deployment in tenant.get("deployments", []):
+            missing = [key for key, default in DEPLOYMENT_SETTINGS.items() if default is None and not deployment.get(key)]
+            if missing:
+                raise ValueError(f"Deployment in tenant {tenant['name']} is missing: {', '.join(missing)}")
+
+        # Relative marker directories are resolved against the campaign file, not the working directory
+        markers = tenant.get("active_deployments_dir", campaign.get("active_deployments_dir"))
+        if markers:
+            tenant["active_deployments_dir"] = os.path.join(
+                os.path.dirname(os.path.abspath(path)), os.path.expanduser(markers)
+            )
+
+    return tenants
+
+
+def configure_deployment(deployment):
+    """Point the Deployment.py globals at a single deployment entry."""
+    for key, default in DEPLOYMENT_SETTINGS.items():
+        setattr(Deployment, key, deployment.get(key, default))
+
+
+def connect_tenant(tenant, limiter):
+    """Authenticate as a tenant and point the Deployment.py API clients at it."""
+    client_id, client_secret = Deployment.authenticate_1password(tenant["vault_name"], tenant["secret_name"])
+    apis = Deployment.initialize_apis(client_id, client_secret, tenant.get("member_cid"))
+
+    (
+        Deployment.host_api,
+        Deployment.host_group_api,
+        Deployment.rtr_admin_api,
+        Deployment.rtr_api,
+    ) = (RateLimitedService(api, limiter) for api in apis)
+    for key, default in TENANT_SETTINGS.items():
+        setattr(Deployment, key, tenant.get(key) or default)
+    Deployment.interactive = False
+
+    # Clear the previous tenant's host settings until a deployment entry sets them
+    configure_deployment({})
+
+
+def run_tenant(tenant, action="deploy"):
+    """
+    Run an action for every deployment of one tenant inside the current worker process.
+
+    Deployment.py keeps its API clients and settings in module globals, so each
+    tenant gets its own process, its own auth object and its own rate limit
+    budget. Deployments within a tenant run one after another.
+    """
+    started = time.monotonic()
+    limiter = RateLimiter(tenant.get("rate_limit_per_minute", default_rate_limit))
+    result = {
+        "tenant": tenant["name"],
+        "member_cid": tenant.get("member_cid"),
+        "deployments": [],
+    }
+
+    try:
+        connect_tenant(tenant, limiter)
+    except Exception as e:
+        result["error"] = f"Authentication failed: {e}"
+    else:
+        for deployment in tenant.get("deployments", []):
+            outcome = {"serial": deployment["serial"], "status": "success"}
+            try:
+                configure_deployment(deployment)
+                outcome.update(getattr(Deployment, ACTIONS[action])() or {})
+            except Exception as e:
+                outcome.update(status="failed", error=str(e))
+            result["deployments"].append(outcome)
+
+    result["api_calls"] = limiter.total_calls
+    result["duration_seconds"] = round(time.monotonic() - started, 1)
+    return result
+
+
+def merge_results(results, action="deploy"):
+    """Merge per-tenant results into a single campaign report."""
+    tenants = sorted(results, key=lambda result: result["tenant"])
+    deployments = [outcome for result in tenants for outcome in result["deployments"]]
+
+    return {
+        "action": action,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "summary": {
+            "tenants": len(tenants),
+            "tenants_failed": sum(1 for result in tenants if "error" in result),
+            "deployments": len(deployments),
+            "succeeded": sum(1 for outcome in deployments if outcome["status"] == "success"),
+            "failed": sum(1 for outcome in deployments if outcome["status"] != "success"),
+            "api_calls": sum(result.get("api_calls", 0) for result in tenants),
+        },
+        "tenants": tenants,
+    }
+
+
+def run_campaign(tenants, max_workers=None, action="deploy"):
+    """Run an action for all tenants in parallel worker processes and return the merged report."""
+    # Sign in once up front so the workers inherit the session instead of prompting in parallel
+    Deployment.signin_1password()
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers or len(tenants)) as executor:
+        futures = {executor.submit(run_tenant, tenant, action): tenant["name"] for tenant in tenants}
+
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"tenant": name, "error": f"Worker process failed: {e}", "deployments": [], "api_calls": 0}
+            results.append(result)
+            print(f"\nTenant {name} finished")
+
+    return merge_results(results, action)
+
+
+def print_report(report):
+    """Print a short summary of the merged campaign report."""
+    print(f"\nCampaign {report['action']} report:")
+    for result in report["tenants"]:
+        if "error" in result:
+            print(f"  {result['tenant']}: {result['error']}")
+        for outcome in result["deployments"]:
+            line = f"  {result['tenant']} / {outcome['serial']}: {outcome['status']}"
+            if "error" in outcome:
+                line += f" ({outcome['error']})"
+            print(line)
+
+    summary = report["summary"]
+    print(
+        f"\n{summary['succeeded']}/{summary['deployments']} hosts succeeded across "
+        f"{summary['tenants']} tenants using {summary['api_calls']} API calls"
+    )
+
+
+if __name__ == "__main__":
+    try:
+        tenants = load_tenants(tenants_file)
+
+        report = run_campaign(tenants, max_workers)
+
+        with open(report_file, "w") as report_data:
+            json.dump(report, report_data, indent=2)
+
+        print_report(report)
+        print(f"\nFull report written to {report_file}")
+
+    except Exception as e:
+        print(f"An error occurred during the campaign: {e}")
@@ -0,0 +1,269 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import Deployment
+import Multi_Tenant_Campaign
+
+# ====================
+# Configuration Section
+# ====================
+
+active_deployment_timeout = 60  # Minutes before an active deployment marker is treated as a dead run
+session_idle_minutes = 10  # RTR sessions updated more recently than this mean the host is still in use
+group_member_page_size = 5000  # Maximum members returned by one query_group_members call
+group_action_batch_size = 500  # Maximum hosts removed by one perform_group_action call
+session_batch_size = 100  # Maximum sessions listed or described by one RTR call
+device_details_batch_size = 5000  # Maximum hosts described by one get_device_details call
+
+# ====================
+# Function Definitions
+# ====================
+
+def batches(items, size):
+    """Split a list into consecutive chunks of at most `size` items."""
+    return [items[index:index + size] for index in range(0, len(items), size)]
+
+
+def parse_timestamp(value):
+    """Parse a Falcon timestamp such as 2024-01-01T12:00:00.123456789Z as UTC."""
+    return datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+
+
+def list_group_members(group_id):
+    """Return every device ID in the host group, paging through the members in bulk."""
+    members = []
+    while True:
+        response = Deployment.host_group_api.query_group_members(
+            id=group_id,
+            limit=group_member_page_size,
+            offset=len(members),
+        )
+        if response["status_code"] != 200:
+            raise RuntimeError(f"Failed to list members of host group {group_id}: {response}")
+
+        page = response["body"]["resources"] or []
+        members.extend(page)
+
+        total = response["body"]["meta"]["pagination"]["total"]
+        if not page or len(members) >= total:
+            return members
+
+
+def list_open_sessions():
+    """Return metadata for every RTR session still open for this API client."""
+    session_ids = []
+    while True:
+        page = Deployment.rtr_api.list_all_sessions(
+            limit=session_batch_size,
+            offset=str(len(session_ids)),
+        )["body"]["resources"] or []
+        session_ids.extend(page)
+        if len(page) < session_batch_size:
+            break
+
+    sessions = []
+    for batch in batches(session_ids, session_batch_size):
+        sessions.extend(Deployment.rtr_api.list_sessions(ids=batch)["body"]["resources"] or [])
+    return sessions
+
+
+def active_deployments():
+    """Return the device IDs with a recent active deployment marker on this machine."""
+    if not os.path.isdir(Deployment.active_deployments_dir):
+        return set()
+
+    cutoff = time.time() - active_deployment_timeout * 60
+    active = set()
+    for device_id in os.listdir(Deployment.active_deployments_dir):
+        try:
+            if os.path.getmtime(os.path.join(Deployment.active_deployments_dir, device_id)) >= cutoff:
+                active.add(device_id)
+        except FileNotFoundError:
+            # The deployment finished and removed its marker after the listing
+            continue
+    return active
+
+
+def hostnames(device_ids):
+    """Map device IDs to hostnames for the sweep report."""
+    names = {}
+    for batch in batches(device_ids, device_details_batch_size):
+        for device in Deployment.host_api.get_device_details(ids=batch)["body"]["resources"] or []:
+            names[device["device_id"]] = device.get("hostname")
+    return names
+
+
+def remove_hosts(group_id, device_ids):
+    """
+    Remove hosts from the group with as few group actions as the batch size allows.
+
+    Returns the device IDs that were removed and one error per failed batch.
+    A failed batch does not stop the batches after it.
+    """
+    removed, errors = [], []
+    for batch in batches(device_ids, group_action_batch_size):
+        device_filter = "device_id:[" + ",".join(f"'{device_id}'" for device_id in batch) + "]"
+        try:
+            response = Deployment.host_group_api.perform_group_action(
+                action_name="remove-hosts",
+                ids=group_id,
+                filter=device_filter,
+            )
+            if "200" not in str(response["status_code"]):
+                raise RuntimeError(response)
+        except Exception as e:
+            errors.append(f"Failed to remove {len(batch)} hosts from host group {group_id}: {e}")
+            continue
+
+        removed.extend(batch)
+        for device_id in batch:
+            Deployment.mark_active(device_id, active=False)
+
+    return removed, errors
+
+
+def delete_sessions(session_ids):
+    """Delete RTR sessions, returning how many were deleted and one error per failure."""
+    deleted, errors = 0, []
+    for session_id in session_ids:
+        try:
+            response = Deployment.rtr_api.delete_session(session_id=session_id)
+            if response["status_code"] not in (200, 204):
+                raise RuntimeError(response)
+        except Exception as e:
+            errors.append(f"Failed to delete RTR session {session_id}: {e}")
+            continue
+        deleted += 1
+
+    return deleted, errors
+
+
+def sweep(dry_run=False):
+    """
+    Remove stale hosts from the RTR enabled group and delete their lingering sessions.
+
+    A host is stale when it is in the group but has no recent active
+    deployment marker and no RTR session updated within session_idle_minutes.
+    Markers only cover runs on this machine, so runs started elsewhere are
+    protected by their sessions once init_session succeeds.
+    """
+    group_id = Deployment.rtr_group_id
+    members = list_group_members(group_id)
+    active = active_deployments()
+
+    idle_cutoff = datetime.now(timezone.utc).timestamp() - session_idle_minutes * 60
+    sessions_by_device = {}
+    in_session = set()
+    for session in list_open_sessions():
+        sessions_by_device.setdefault(session["device_id"], []).append(session["id"])
+        if parse_timestamp(session.get("updated_at") or session["created_at"]).timestamp() >= idle_cutoff:
+            in_session.add(session["device_id"])
+
+    stale = [device_id for device_id in members if device_id not in active and device_id not in in_session]
+    lingering = [session_id for device_id in stale for session_id in sessions_by_device.get(device_id, [])]
+    names = hostnames(stale) if stale else {}
+
+    print(
+        f"\n{len(members)} hosts in RTR enabled group, {len(stale)} stale, "
+        f"{len(members) - len(stale)} in use, {len(lingering)} lingering sessions"
+    )
+
+    removed, sessions_deleted, errors = [], 0, []
+    if not dry_run:
+        removed, errors = remove_hosts(group_id, stale)
+        sessions_deleted, session_errors = delete_sessions(lingering)
+        errors.extend(session_errors)
+
+    removed = set(removed)
+    return {
+        "members": len(members),
+        "in_use": len(members) - len(stale),
+        "stale": [
+            {"device_id": device_id, "hostname": names.get(device_id), "removed": device_id in removed}
+            for device_id in stale
+        ],
+        "removed": len(removed),
+        "errors": errors,
+        "sessions_deleted": sessions_deleted,
+        "dry_run": dry_run,
+    }
+
+
+def sweep_tenant(tenant, dry_run=False):
+    """Sweep one tenant's RTR enabled group inside the current worker process."""
+    started = time.monotonic()
+    limiter = Multi_Tenant_Campaign.RateLimiter(
+        tenant.get("rate_limit_per_minute", Multi_Tenant_Campaign.default_rate_limit)
+    )
+    result = {"tenant": tenant["name"], "member_cid": tenant.get("member_cid")}
+
+    try:
+        Multi_Tenant_Campaign.connect_tenant(tenant, limiter)
+        result.update(sweep(dry_run))
+    except Exception as e:
+        result["error"] = str(e)
+
+    result["api_calls"] = limiter.total_calls
+    result["duration_seconds"] = round(time.monotonic() - started, 1)
+    return result
+
+
+def run_sweep(tenants, max_workers=None, dry_run=False):
+    """Sweep all tenants in parallel worker processes and return the merged report."""
+    Deployment.signin_1password()
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers or len(tenants)) as executor:
+        futures = {executor.submit(sweep_tenant, tenant, dry_run): tenant["name"] for tenant in tenants}
+
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"tenant": name, "error": f"Worker process failed: {e}", "api_calls": 0})
+
+    tenants = sorted(results, key=lambda result: result["tenant"])
+    return {
+        "action": "sweep",
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "summary": {
+            "tenants": len(tenants),
+            "tenants_failed": sum(1 for result in tenants if "error" in result or result.get("errors")),
+            "stale": sum(len(result.get("stale", [])) for result in tenants),
+            "removed": sum(result.get("removed", 0) for result in tenants),
+            "sessions_deleted": sum(result.get("sessions_deleted", 0) for result in tenants),
+            "api_calls": sum(result["api_calls"] for result in tenants),
+        },
+        "tenants": tenants,
+    }
+
+
+def print_sweep_report(report):
+    """Print a short summary of the sweep report."""
+    print("\nSweep report:")
+    for result in report["tenants"]:
+        if "error" in result:
+            print(f"  {result['tenant']}: failed ({result['error']})")
+            continue
+
+        if result["dry_run"]:
+            print(f"  {result['tenant']}: would remove {len(result['stale'])}/{result['members']} hosts")
+        else:
+            print(
+                f"  {result['tenant']}: removed {result['removed']} of {len(result['stale'])} stale hosts "
+                f"({result['members']} in group), deleted {result['sessions_deleted']} sessions"
+            )
+        for host in result["stale"]:
+            note = "" if result["dry_run"] or host["removed"] else " (not removed)"
+            print(f"    {host['hostname'] or host['device_id']}{note}")
+        for error in result["errors"]:
+            print(f"    Error: {error}")
+
+    summary = report["summary"]
+    print(
+        f"\n{summary['removed']}/{summary['stale']} stale hosts removed across {summary['tenants']} tenants "
+        f"using {summary['api_calls']} API calls"
+    )
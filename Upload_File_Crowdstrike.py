@@ -2,7 +2,6 @@ import os
 import platform
 import subprocess
 import json
-from falconpy import RealTimeResponseAdmin, OAuth2
 
 
 # ====================
@@ -88,7 +87,7 @@ def get_crowdstrike_credentials(vault_name, secret_name):
     return client_id, client_secret
 
 
-def check_api_credentials(client_id, client_secret):
+def check_api_credentials(client_id, client_secret, member_cid=None):
     """
     Verify CrowdStrike API credentials.
 
@@ -97,11 +96,14 @@ def check_api_credentials(client_id, client_secret):
     Args:
         client_id (str): CrowdStrike API Client ID.
         client_secret (str): CrowdStrike API Client Secret.
+        member_cid (str, optional): Child CID to authenticate against.
 
     Returns:
         bool: True if credentials are valid, False otherwise.
     """
-    oauth2 = OAuth2(client_id=client_id, client_secret=client_secret)
+    from falconpy import OAuth2
+
+    oauth2 = OAuth2(client_id=client_id, client_secret=client_secret, member_cid=member_cid)
     response = oauth2.token()
 
     # Handle both 200 and 201 as successful responses
@@ -113,7 +115,7 @@ def check_api_credentials(client_id, client_secret):
         return False
 
 
-def upload_file_to_crowdstrike(client_id, client_secret, file_path, description):
+def upload_file_to_crowdstrike(client_id, client_secret, file_path, description, member_cid=None):
     """
     Upload a file to CrowdStrike for use with Real-Time Response (RTR).
 
@@ -125,13 +127,16 @@ def upload_file_to_crowdstrike(client_id, client_secret, file_path, description)
         client_secret (str): CrowdStrike API Client Secret.
         file_path (str): Path to the file to upload.
         description (str): Description for the uploaded file.
+        member_cid (str, optional): Child CID to upload the file to.
 
     Raises:
         FileNotFoundError: If the file to upload does not exist.
         Exception: For any errors during the file upload process.
     """
+    from falconpy import RealTimeResponseAdmin
+
     # Initialize RTR Admin API client
-    rtr_admin_api = RealTimeResponseAdmin(client_id=client_id, client_secret=client_secret)
+    rtr_admin_api = RealTimeResponseAdmin(client_id=client_id, client_secret=client_secret, member_cid=member_cid)
 
     # Ensure the file exists before attempting upload
     if not os.path.isfile(file_path):
@@ -0,0 +1,117 @@
+import pytest
+
+import Deployment
+
+
+class StubApi:
+    """Stand-in for the falconpy service classes that records calls and fails on request."""
+
+    def __init__(self, fail_on=None, session_ready=True):
+        self.calls = []
+        self.fail_on = fail_on
+        self.session_ready = session_ready
+
+    def __getattr__(self, name):
+        def call(**kwargs):
+            self.calls.append(name)
+            if name == self.fail_on:
+                raise RuntimeError(f"{name} failed")
+            resources = {
+                "query_devices_by_filter_scroll": ["device-1"],
+                "get_online_state": [{"state": "online"}],
+                "get_device_details": [{"platform_name": "Mac"}],
+                "perform_group_action": [{"assignment_rule": "device_id:['device-1']"}],
+                "init_session": [{"session_id": "aaaa-bbbb-cccc-dddd-eeee"}] if self.session_ready else [],
+                "execute_admin_command": [{"cloud_request_id": "request-1"}],
+                "check_admin_command_status": [{"stdout": "", "stderr": "", "complete": True}],
+            }.get(name, [])
+            return {"status_code": 201 if name == "execute_admin_command" else 200, "body": {"resources": resources}}
+        return call
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    def configure(**kwargs):
+        api = StubApi(**kwargs)
+        for name in ("host_api", "host_group_api", "rtr_admin_api", "rtr_api"):
+            monkeypatch.setattr(Deployment, name, api, raising=False)
+        monkeypatch.setattr(Deployment.time, "sleep", lambda seconds: None)
+        monkeypatch.setattr(Deployment, "interactive", False)
+        monkeypatch.setattr(Deployment, "active_deployments_dir", str(tmp_path / "active"))
+        monkeypatch.setattr(Deployment, "serial", "SERIAL1")
+        monkeypatch.setattr(Deployment, "username", "user")
+        monkeypatch.setattr(Deployment, "file_to_put", "CanaryToken.docx")
+        monkeypatch.setattr(Deployment, "renamed_file", "DecoyToken.docx")
+        monkeypatch.setattr(Deployment, "mac_file_path", "/Users/user/Documents")
+        return api
+    return configure
+
+
+def test_main_leaves_rtr_group_when_a_step_fails(stub):
+    api = stub(fail_on="check_admin_command_status")
+
+    with pytest.raises(RuntimeError):
+        Deployment.main()
+
+    assert api.calls[-2:] == ["perform_group_action", "delete_session"]
+
+
+def test_unattended_session_retries_are_capped(stub, monkeypatch):
+    api = stub(session_ready=False)
+    monkeypatch.setattr(Deployment, "max_session_retries", 2)
+
+    with pytest.raises(Deployment.DeploymentAborted):
+        Deployment.main()
+
+    assert api.calls.count("init_session") == 3
+    # The host is still taken out of the group, and there is no session to delete
+    assert api.calls[-1] == "perform_group_action"
+
+
+class SlowListingApi(StubApi):
+    """Reports the listing as still running for the first `pending` status checks."""
+
+    def __init__(self, pending):
+        super().__init__()
+        self.pending = pending
+
+    def check_admin_command_status(self, **kwargs):
+        self.calls.append("check_admin_command_status")
+        complete = self.pending <= 0
+        self.pending -= 1
+        return {"status_code": 200, "body": {"resources": [{"stderr": "", "complete": complete}]}}
+
+
+def test_verify_file_polls_until_the_listing_completes(monkeypatch):
+    api = SlowListingApi(pending=2)
+    monkeypatch.setattr(Deployment, "rtr_admin_api", api, raising=False)
+    monkeypatch.setattr(Deployment.time, "sleep", lambda seconds: None)
+
+    Deployment.verify_file("session-1", "Mac", "/Users/user/Documents/DecoyToken.docx")
+
+    assert api.calls.count("check_admin_command_status") == 3
+
+
+def test_verify_file_gives_up_on_a_listing_that_never_completes(monkeypatch):
+    api = SlowListingApi(pending=100)
+    monkeypatch.setattr(Deployment, "rtr_admin_api", api, raising=False)
+    monkeypatch.setattr(Deployment, "max_status_checks", 3)
+    monkeypatch.setattr(Deployment.time, "sleep", lambda seconds: None)
+
+    with pytest.raises(RuntimeError):
+        Deployment.verify_file("session-1", "Mac", "/Users/user/Documents/DecoyToken.docx")
+
+    assert api.calls.count("check_admin_command_status") == 3
+
+
+def test_verify_file_reports_missing_windows_file(monkeypatch):
+    api = StubApi()
+    api.check_admin_command_status = lambda **kwargs: {
+        "status_code": 200,
+        "body": {"resources": [{"stderr": "File Not Found", "complete": True}]},
+    }
+    monkeypatch.setattr(Deployment, "rtr_admin_api", api, raising=False)
+    monkeypatch.setattr(Deployment.time, "sleep", lambda seconds: None)
+
+    with pytest.raises(FileNotFoundError):
+        Deployment.verify_file("session-1", "Windows", r"C:\Users\user\Documents\DecoyToken.docx")
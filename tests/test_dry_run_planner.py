@@ -0,0 +1,110 @@
+import pytest
+
+import Deployment
+import Dry_Run_Planner
+
+
+class RecordingApi:
+    """Stand-in for a falconpy service class that records every call."""
+
+    def __init__(self, calls, host_OS):
+        self.calls = calls
+        self.host_OS = host_OS
+        self.session_attempts = 0
+
+    def __getattr__(self, name):
+        def call(**kwargs):
+            self.calls.append(name)
+            return self.respond(name)
+        return call
+
+    def respond(self, name):
+        if name == "init_session":
+            # RTR is not ready on the first attempt, as after a real add-hosts
+            self.session_attempts += 1
+            if self.session_attempts == 1:
+                return {"status_code": 200, "body": {"resources": []}}
+        resources = {
+            "query_devices_by_filter_scroll": ["device-1"],
+            "get_online_state": [{"state": "online"}],
+            "get_device_details": [{"platform_name": self.host_OS}],
+            "perform_group_action": [{"assignment_rule": "device_id:['device-1']"}],
+            "init_session": [{"session_id": "aaaa-bbbb-cccc-dddd-eeee"}],
+            "execute_admin_command": [{"cloud_request_id": "request-1"}],
+            "check_admin_command_status": [{"stdout": "", "stderr": "", "complete": True}],
+            "list_all_sessions": [],
+        }.get(name, [])
+        status_code = 201 if name == "execute_admin_command" else 200
+        return {"status_code": status_code, "body": {"resources": resources}}
+
+
+@pytest.fixture
+def recorded(monkeypatch, tmp_path):
+    """Point Deployment.py at recording APIs and capture its sleeps instead of waiting."""
+    calls, sleeps = [], []
+
+    def configure(host_OS, renamed_file):
+        api = RecordingApi(calls, host_OS)
+        for name in ("host_api", "host_group_api", "rtr_admin_api", "rtr_api"):
+            monkeypatch.setattr(Deployment, name, api, raising=False)
+        monkeypatch.setattr(Deployment.time, "sleep", sleeps.append)
+        monkeypatch.setattr(Deployment, "interactive", False)
+        monkeypatch.setattr(Deployment, "active_deployments_dir", str(tmp_path / "active"))
+        monkeypatch.setattr(Deployment, "serial", "SERIAL1")
+        monkeypatch.setattr(Deployment, "username", "user")
+        monkeypatch.setattr(Deployment, "file_to_put", "CanaryToken.docx")
+        monkeypatch.setattr(Deployment, "renamed_file", renamed_file)
+        monkeypatch.setattr(Deployment, "win_file_path", r"C:\Users\user\Documents")
+        monkeypatch.setattr(Deployment, "mac_file_path", "/Users/user/Documents")
+        return calls, sleeps
+
+    return configure
+
+
+@pytest.mark.parametrize("action, entry_point", [
+    ("deploy", "main"),
+    ("verify", "verify"),
+    ("cleanup", "cleanup"),
+])
+@pytest.mark.parametrize("host_OS", ["Windows", "Mac"])
+@pytest.mark.parametrize("renamed_file", ["", "DecoyToken.docx"])
+def test_plan_host_matches_deployment(recorded, action, entry_point, host_OS, renamed_file):
+    calls, sleeps = recorded(host_OS, renamed_file)
+
+    getattr(Deployment, entry_point)()
+
+    steps = Dry_Run_Planner.plan_host(action, host_OS, renamed_file)
+    assert len(calls) == sum(step["api_calls"] for step in steps)
+    assert sum(sleeps) == sum(step["wait_seconds"] for step in steps)
+
+
+def test_makespan_hands_tenants_to_first_free_worker():
+    assert Dry_Run_Planner.makespan([3, 2, 1], 2) == 3
+    assert Dry_Run_Planner.makespan([1, 1, 1], 1) == 3
+    assert Dry_Run_Planner.makespan([4, 1], None) == 4
+
+
+def test_estimate_runs_each_tenant_sequentially_with_one_token():
+    tenants = [
+        {"name": "a", "deployments": [{"serial": "1"}, {"serial": "2"}]},
+        {"name": "b", "deployments": [{"serial": "3"}]},
+    ]
+    plan = Dry_Run_Planner.build_plan(tenants, "cleanup")
+
+    estimate = Dry_Run_Planner.estimate(plan, max_workers=1, call_latency=1)
+
+    # cleanup makes 3 calls per host, plus one OAuth2 token per tenant
+    assert [tenant["api_calls"] for tenant in estimate["tenants"]] == [7, 4]
+    assert estimate["api_calls"] == 11
+    # One worker runs the tenants back to back, one second per call
+    assert estimate["seconds"] == 11
+    assert Dry_Run_Planner.estimate(plan, max_workers=2, call_latency=1)["seconds"] == 7
+
+
+def test_estimate_respects_rate_limit_budget():
+    plan = Dry_Run_Planner.build_plan([{"name": "a", "rate_limit_per_minute": 1, "deployments": [{"serial": "1"}]}], "cleanup")
+
+    estimate = Dry_Run_Planner.estimate(plan, call_latency=0)
+
+    assert estimate["seconds"] == 4 * 60
+    assert estimate["min_headroom_percent"] == 0
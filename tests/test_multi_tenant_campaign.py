@@ -0,0 +1,67 @@
+import os
+import json
+import multiprocessing
+
+import pytest
+
+import Deployment
+import Multi_Tenant_Campaign
+
+
+def write_campaign(tmp_path, **settings):
+    tenant = {"name": "a", "vault_name": "v", "secret_name": "s", "rtr_group_id": "g"}
+    tenant.update(settings.pop("tenant", {}))
+    campaign_file = tmp_path / "campaign.json"
+    campaign_file.write_text(json.dumps(dict(settings, tenants=[tenant])))
+    return str(campaign_file)
+
+
+def test_default_marker_directory_is_absolute():
+    assert os.path.isabs(Deployment.active_deployments_dir)
+
+
+def test_marker_directory_resolves_against_campaign_file(tmp_path, monkeypatch):
+    monkeypatch.chdir("/")
+
+    tenants = Multi_Tenant_Campaign.load_tenants(write_campaign(tmp_path, active_deployments_dir="state"))
+
+    assert tenants[0]["active_deployments_dir"] == str(tmp_path / "state")
+
+
+def test_tenant_marker_directory_overrides_campaign(tmp_path):
+    campaign_file = write_campaign(
+        tmp_path,
+        active_deployments_dir="state",
+        tenant={"active_deployments_dir": "/var/lib/deception"},
+    )
+
+    tenants = Multi_Tenant_Campaign.load_tenants(campaign_file)
+
+    assert tenants[0]["active_deployments_dir"] == "/var/lib/deception"
+
+
+def test_reused_worker_resets_tenant_settings(monkeypatch):
+    if multiprocessing.get_start_method() != "fork":
+        pytest.skip("patched Deployment functions only reach workers through fork")
+
+    monkeypatch.setattr(Deployment, "signin_1password", lambda: None)
+    monkeypatch.setattr(Deployment, "authenticate_1password", lambda vault, secret: ("id", "secret"))
+    monkeypatch.setattr(Deployment, "initialize_apis", lambda *args: (object(),) * 4)
+    monkeypatch.setattr(Deployment, "resolve_host", lambda: {
+        "active_deployments_dir": Deployment.active_deployments_dir,
+        "rtr_group_id": Deployment.rtr_group_id,
+        "member_cid": Deployment.member_cid,
+    })
+    tenant = {"vault_name": "v", "secret_name": "s", "deployments": [{"serial": "1", "username": "u", "file_to_put": "f"}]}
+    tenants = [
+        dict(tenant, name="a", rtr_group_id="group-a", member_cid="cid-a", active_deployments_dir="/custom/a"),
+        dict(tenant, name="b", rtr_group_id="group-b"),
+    ]
+
+    report = Multi_Tenant_Campaign.run_campaign(tenants, max_workers=1, action="resolve")
+
+    outcomes = {result["tenant"]: result["deployments"][0] for result in report["tenants"]}
+    assert outcomes["a"]["active_deployments_dir"] == "/custom/a"
+    assert outcomes["b"]["active_deployments_dir"] == Multi_Tenant_Campaign.TENANT_SETTINGS["active_deployments_dir"]
+    assert outcomes["b"]["rtr_group_id"] == "group-b"
+    assert outcomes["b"]["member_cid"] is None
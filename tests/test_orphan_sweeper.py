@@ -0,0 +1,181 @@
+import os
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+import Deployment
+import Orphan_Sweeper
+
+RECENT = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.123456789Z")
+IDLE = "2020-01-01T00:00:00Z"
+
+
+class SweepApi:
+    """Stand-in for the host, host group and RTR service classes used by a sweep."""
+
+    def __init__(self, members, sessions=(), failed_batches=(), failed_sessions=()):
+        self.members = list(members)
+        self.sessions = list(sessions)
+        self.failed_batches = failed_batches
+        self.failed_sessions = failed_sessions
+        self.calls = []
+
+    def query_group_members(self, id, limit, offset):
+        self.calls.append(("query_group_members", offset))
+        page = self.members[offset:offset + limit]
+        return {
+            "status_code": 200,
+            "body": {"resources": page, "meta": {"pagination": {"total": len(self.members)}}},
+        }
+
+    def list_all_sessions(self, limit, offset):
+        self.calls.append(("list_all_sessions", offset))
+        ids = [session["id"] for session in self.sessions][int(offset):int(offset) + limit]
+        return {"status_code": 200, "body": {"resources": ids}}
+
+    def list_sessions(self, ids):
+        self.calls.append(("list_sessions", list(ids)))
+        return {"status_code": 200, "body": {"resources": [s for s in self.sessions if s["id"] in ids]}}
+
+    def get_device_details(self, ids):
+        self.calls.append(("get_device_details", list(ids)))
+        resources = [{"device_id": device_id, "hostname": f"host-{device_id}"} for device_id in ids]
+        return {"status_code": 200, "body": {"resources": resources}}
+
+    def perform_group_action(self, action_name, ids, filter):
+        self.calls.append(("perform_group_action", filter))
+        batch_number = sum(1 for call in self.calls if call[0] == "perform_group_action")
+        return {"status_code": 500 if batch_number in self.failed_batches else 200, "body": {}}
+
+    def delete_session(self, session_id):
+        self.calls.append(("delete_session", session_id))
+        return {"status_code": 500 if session_id in self.failed_sessions else 204, "body": {}}
+
+    def changes(self):
+        return [call for call in self.calls if call[0] in ("perform_group_action", "delete_session")]
+
+
+def session(session_id, device_id, updated_at):
+    return {"id": session_id, "device_id": device_id, "created_at": IDLE, "updated_at": updated_at}
+
+
+@pytest.fixture
+def connect(monkeypatch, tmp_path):
+    """Point Deployment.py at a SweepApi and an empty marker directory."""
+    markers = tmp_path / "active"
+    markers.mkdir()
+
+    def configure(api):
+        for name in ("host_api", "host_group_api", "rtr_api"):
+            monkeypatch.setattr(Deployment, name, api, raising=False)
+        monkeypatch.setattr(Deployment, "rtr_group_id", "group-1")
+        monkeypatch.setattr(Deployment, "active_deployments_dir", str(markers))
+        return markers
+
+    return configure
+
+
+def test_stale_hosts_skip_recent_markers_and_sessions(connect):
+    api = SweepApi(
+        members=["recent-marker", "expired-marker", "recent-session", "idle-session", "nothing"],
+        sessions=[
+            session("s-recent", "recent-session", RECENT),
+            session("s-idle", "idle-session", IDLE),
+            session("s-other", "not-a-member", IDLE),
+        ],
+    )
+    markers = connect(api)
+    (markers / "recent-marker").write_text("1")
+    (markers / "expired-marker").write_text("1")
+    expired = time.time() - (Orphan_Sweeper.active_deployment_timeout + 5) * 60
+    os.utime(markers / "expired-marker", (expired, expired))
+
+    result = Orphan_Sweeper.sweep()
+
+    assert [host["device_id"] for host in result["stale"]] == ["expired-marker", "idle-session", "nothing"]
+    assert result["in_use"] == 2
+    # Only the stale host's session is deleted
+    assert [call for call in api.calls if call[0] == "delete_session"] == [("delete_session", "s-idle")]
+    assert result["sessions_deleted"] == 1
+    # The expired marker is cleared once its host is removed
+    assert not (markers / "expired-marker").exists()
+    assert (markers / "recent-marker").exists()
+
+
+def test_group_members_and_sessions_are_paged(connect, monkeypatch):
+    monkeypatch.setattr(Orphan_Sweeper, "group_member_page_size", 2)
+    monkeypatch.setattr(Orphan_Sweeper, "session_batch_size", 2)
+    api = SweepApi(
+        members=[f"d{index}" for index in range(5)],
+        sessions=[session(f"s{index}", f"d{index}", RECENT) for index in range(3)],
+    )
+    connect(api)
+
+    assert Orphan_Sweeper.list_group_members("group-1") == [f"d{index}" for index in range(5)]
+    assert len(Orphan_Sweeper.list_open_sessions()) == 3
+
+    assert [offset for name, offset in api.calls if name == "query_group_members"] == [0, 2, 4]
+    assert [offset for name, offset in api.calls if name == "list_all_sessions"] == ["0", "2"]
+    assert [ids for name, ids in api.calls if name == "list_sessions"] == [["s0", "s1"], ["s2"]]
+
+
+def test_remove_hosts_filter_is_split_into_batches(connect, monkeypatch):
+    monkeypatch.setattr(Orphan_Sweeper, "group_action_batch_size", 2)
+    api = SweepApi(members=[f"d{index}" for index in range(5)])
+    connect(api)
+
+    result = Orphan_Sweeper.sweep()
+
+    assert [call[1] for call in api.changes()] == [
+        "device_id:['d0','d1']",
+        "device_id:['d2','d3']",
+        "device_id:['d4']",
+    ]
+    assert result["removed"] == 5
+
+
+def test_dry_run_changes_nothing(connect):
+    api = SweepApi(members=["d0", "d1"], sessions=[session("s0", "d0", IDLE)])
+    connect(api)
+
+    result = Orphan_Sweeper.sweep(dry_run=True)
+
+    assert api.changes() == []
+    assert len(result["stale"]) == 2
+    assert result["removed"] == 0
+    assert result["sessions_deleted"] == 0
+
+
+def test_failures_are_reported_without_stopping_the_sweep(connect, monkeypatch):
+    monkeypatch.setattr(Orphan_Sweeper, "group_action_batch_size", 1)
+    api = SweepApi(
+        members=["d0", "d1", "d2"],
+        sessions=[session("s0", "d0", IDLE), session("s2", "d2", IDLE)],
+        failed_batches=(2,),
+        failed_sessions=("s0",),
+    )
+    connect(api)
+
+    result = Orphan_Sweeper.sweep()
+
+    assert [host["removed"] for host in result["stale"]] == [True, False, True]
+    assert result["removed"] == 2
+    assert result["sessions_deleted"] == 1
+    assert len(result["errors"]) == 2
+
+
+def test_marker_removed_during_listing_is_skipped(connect, monkeypatch):
+    markers = connect(SweepApi(members=[]))
+    (markers / "finished").write_text("1")
+    (markers / "running").write_text("1")
+    getmtime = os.path.getmtime
+
+    def finished_mid_listing(path):
+        if path.endswith("finished"):
+            raise FileNotFoundError(path)
+        return getmtime(path)
+
+    monkeypatch.setattr(Orphan_Sweeper.os.path, "getmtime", finished_mid_listing)
+
+    assert Orphan_Sweeper.active_deployments() == {"running"}